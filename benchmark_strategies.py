@@ -0,0 +1,88 @@
+#! python3
+"""
+Benchmark the advanced strategies (see board_solver.ADVANCED_STRATEGIES) on a corpus of evil Sudoku boards
+
+Reports the guesses and solve time with none, all and the default set (DEFAULT_ADVANCED_STRATEGIES) of advanced strategies
+For each strategy, reports the guesses and solve time it saves (positive means it pays for itself):
+    - alone         : only that strategy on, compared to none of the advanced strategies
+    - in the default: the default set with that strategy, compared to the default set without it
+Time is the best of --repeat runs over the whole corpus, with the spread (slowest - fastest run) to show how noisy it is
+
+See board_solver.py -> for details on the SudokuPuzzle object
+See strategies.py   -> for details on non-recursive solving strategies
+"""
+import argparse
+import copy
+import time
+from board_solver import SudokuPuzzle, ADVANCED_STRATEGIES, DEFAULT_ADVANCED_STRATEGIES, check_complete
+from solve_given_boards import evilBoard1, worldsHardestBoard
+
+# Evil boards, read left to right and then top to bottom, with . for empty cells
+EVIL_BOARDS = [
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+    "48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....",
+    "....14....3....2...7..........9...3.6.1.............8.2.....1.4....5.6.....7.8...",
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..",
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    ".......39.....1..5..3.5.8....8.9...6.7...2..1..4.......9.8..5..2....6..4..7......",
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+]
+
+def evil_corpus():
+    """Return the evil boards as lists of 9 rows with 9 cells each"""
+    boards = [copy.deepcopy(evilBoard1), copy.deepcopy(worldsHardestBoard)]
+    for puzzle in EVIL_BOARDS:
+        boards.append([[0 if char == '.' else int(char) for char in puzzle[y*9:y*9 + 9]] for y in range(9)])
+    return boards
+
+def run_corpus(boards, advanced_strategies, repeat):
+    """Solve every board with the given advanced strategies and return (total guesses, best total time, time spread)"""
+    times = []
+    for _ in range(repeat):
+        guesses = 0
+        start   = time.perf_counter()
+        for board in boards:
+            sudoku = SudokuPuzzle(board, verbose=False, advanced_strategies=advanced_strategies)
+            sudoku.solve()
+            if check_complete(sudoku) is False:
+                raise RuntimeError(f'Failed to solve board with strategies {advanced_strategies}')
+            guesses += sudoku.trials
+        times.append(time.perf_counter() - start)
+
+    return guesses, min(times), max(times) - min(times)
+
+def main():
+    """Print guesses and time saved by each advanced strategy on the evil corpus"""
+    parser = argparse.ArgumentParser(description='Benchmark the advanced Sudoku strategies on evil boards')
+    parser.add_argument('-r', '--repeat', type=int, default=7, help='runs per configuration (default: 7)')
+    args = parser.parse_args()
+
+    boards = evil_corpus()
+    names  = list(ADVANCED_STRATEGIES)
+
+    none    = run_corpus(boards, (), args.repeat)
+    every   = run_corpus(boards, names, args.repeat)
+    default = run_corpus(boards, DEFAULT_ADVANCED_STRATEGIES, args.repeat)
+    print(f'{len(boards)} evil boards, best of {args.repeat} runs (spread = slowest - fastest run)')
+    for label, (guesses, best_time, spread) in (('none', none), ('all', every), ('default', default)):
+        print(f'{label:<16} guesses: {guesses:5d}  time: {best_time:.3f}s (spread {spread:.3f}s)')
+    print(f'{"":<16} default strategies: {", ".join(DEFAULT_ADVANCED_STRATEGIES)}')
+    print()
+    print(f'{"strategy":<16} {"saved alone":<28} saved in the default')
+    for name in names:
+        on_guesses, on_time, _ = run_corpus(boards, [name], args.repeat)
+        # Compare the default set with and without this strategy
+        if name in DEFAULT_ADVANCED_STRATEGIES:
+            with_strategy    = default
+            without_strategy = run_corpus(boards, [other for other in DEFAULT_ADVANCED_STRATEGIES if other != name], args.repeat)
+        else:
+            with_strategy    = run_corpus(boards, [*DEFAULT_ADVANCED_STRATEGIES, name], args.repeat)
+            without_strategy = default
+        print(f'{name:<16} '
+              f'{none[0] - on_guesses:4d} guesses, {none[1] - on_time:+.3f}s   '
+              f'{without_strategy[0] - with_strategy[0]:4d} guesses, {without_strategy[1] - with_strategy[1]:+.3f}s')
+
+if __name__ == '__main__':
+    main()
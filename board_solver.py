@@ -8,6 +8,7 @@ Class: SudokuBoard()
         - print the solution
         - print the number of loops needed using strategies in strategies.py
         - print whether trial and error (through recursion) was needed
+    Pass verbose=False to solve without printing anything
 """
 import copy
 import strategies
@@ -18,62 +19,51 @@ import strategies
     # Key: region-basis cell coordinates (region, cell) -> Value: standard row-basis cell coordinates (y, x)
 ROWS_TO_REGIONS = strategies.row_to_region_map()
 
-def count_possibilities(board_repr):
-    """Count total number of possibilities remaining on sudoku board"""
-    total = 0
-    for row in board_repr:
-        for col in row:
-            if isinstance(col, set) and len(col) > 1:
-                total += len(col)
-    return total
+# Strategies that are only applied once the simpler strategies stall
+# See benchmark_strategies.py for the guesses and time each one saves
+ADVANCED_STRATEGIES = {
+    'x_wing'         : lambda board: strategies.elim_fish(board, 2),
+    'swordfish'      : lambda board: strategies.elim_fish(board, 3),
+    'jellyfish'      : lambda board: strategies.elim_fish(board, 4),
+    'xy_wing'        : strategies.elim_xy_wing,
+    'xyz_wing'       : strategies.elim_xyz_wing,
+    'simple_coloring': strategies.elim_simple_coloring,
+}
+# Fish save no guesses on the evil boards once the wings and coloring are applied, so they are not applied by default
+DEFAULT_ADVANCED_STRATEGIES = ('xy_wing', 'xyz_wing', 'simple_coloring')
+
+# Simpler strategies applied on every loop, in order
+BASIC_STRATEGIES = {
+    'fill_one_possibility': strategies.fill_one_possibility,
+    'fill_only_location'  : strategies.fill_only_location,
+    'line_in_region'      : strategies.elim_line_in_region,
+    'region_in_line'      : strategies.elim_region_in_line,
+    **{f'hidden_chain_{n}': lambda board, n=n: strategies.elim_hidden_chain(board, n) for n in range(2, 6)},
+    **{f'naked_chain_{n}' : lambda board, n=n: strategies.elim_naked_chain (board, n) for n in range(2, 6)},
+}
+
+def count_possibilities(board):
+    """Count total number of possibilities remaining on sudoku board (maintained by update/eliminate)
+        - includes unsolved cells with a single possibility, which are counted as 1 each
+    """
+    return board.possibility_count
 
 def check_error(board):
-    """Check for unique values in each row, column, and region"""
-    # Columns should not have repeating values
-    col_values = {x:set() for x in range(0,9)}
-    for row in board.rows:
-        # Rows should not have repeating values
-        row_values = set()
-        for x, col in enumerate(row):
-            if isinstance(col, int):
-                if col in row_values or col in col_values[x]:
-                    # Found repeating value within the same row or column
-                    return True
-                row_values.add(col)
-                col_values[x].add(col)
-
-    for region in board.regions:
-        # Regions should not have repeating values
-        region_values = set()
-        for cell in region:
-            if isinstance(cell, int):
-                if cell in region_values:
-                    # Found repeating value with the same region
-                    return True
-                region_values.add(cell)
-
-    return False
+    """Check whether a contradiction has been found on the board (maintained by update/eliminate)
+        - a repeated number in a row, column or region
+        - an unsolved cell with no possibilities left
+        - an unsolved number with no possible location left in a row, column or region
+    """
+    return board.error
 
 def check_complete(board):
     """Check if board contains valid solution"""
-    # Check for repeating numbers in rows and columns
-    if check_error(board) is True:
-        return False
-
-    # Check for nine occurences of each number
-    int_dict = {number:0 for number in range(1,10)}
-    for row in board.rows:
-        for col in row:
-            if not isinstance(col, int):
-                return False
-            int_dict[col] += 1
-
-    return bool( all(count == 9 for count in int_dict.values()) )
+    return not board.error and board.placed_count == 81
 
 class SudokuPuzzle():
     """Input, track and solve a 9x9 Sudoku board"""
 
-    def __init__(self, simple_board):
+    def __init__(self, simple_board, verbose=True, advanced_strategies=DEFAULT_ADVANCED_STRATEGIES):
         # Save the original board state
         self.original_board = copy.deepcopy(simple_board)
 
@@ -82,44 +72,100 @@ class SudokuPuzzle():
         self.pre_recursion_loops = 0 # Loops before recursion
         self.trials              = 0 # Guesses
 
-        # Replace 0's with sets of {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        for y, row in enumerate(simple_board):
-            for x, col in enumerate(row):
-                if col == 0:
-                    simple_board[y][x] = set(range(1,10))
+        # Print progress while solving
+        self.verbose = verbose
+
+        # Names of the ADVANCED_STRATEGIES to apply, in order
+        self.advanced_strategies = tuple(advanced_strategies)
+        unknown = [name for name in self.advanced_strategies if name not in ADVANCED_STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown advanced strategies {unknown}, expected names from {list(ADVANCED_STRATEGIES)}")
+
+        # Incrementally maintained counters, indexed by unit (see strategies.UNITS) and number
+        self.number_counts     = [[0]*10 for _ in range(27)] # Times each number is placed in each row/column/region
+        self.location_counts   = [[0] + [9]*9 for _ in range(27)] # Possible locations of each number in each row/column/region
+        self.location_masks    = [[0] + [0x1FF]*9 for _ in range(27)] # Bitmasks of those locations (see strategies.digit_location_masks)
+        self.placed_count      = 0                           # Solved cells
+        self.possibility_count = 81 * 9                      # Possibilities remaining across all unsolved cells (see count_possibilities)
+        self.error             = False                       # Contradiction found
 
         self.rows    = [[0]*9 for _ in range(9)]
         self.cols    = [[0]*9 for _ in range(9)]
         self.regions = [[0]*9 for _ in range(9)] # Indexed from left to right, and then top to bottom
 
-        # Construct the three representations of the Sudoku board
+        # Construct the three representations of an empty Sudoku board, with sets of {1, 2, 3, 4, 5, 6, 7, 8, 9}
+        for y in range(9):
+            for x in range(9):
+                cell = set(range(1,10))
+                self.rows[y][x] = cell
+                self.cols[x][y] = cell
+                self.regions[ ROWS_TO_REGIONS[(y, x)][0] ][ ROWS_TO_REGIONS[(y, x)][1] ] = cell
+
+        # Place the starting numbers
         for y, row in enumerate(simple_board):
             for x, col in enumerate(row):
-                self.rows[y][x] = col
-                self.cols[x][y] = col
-                self.regions[ ROWS_TO_REGIONS[(y, x)][0] ][ ROWS_TO_REGIONS[(y, x)][1] ] = col
+                if col != 0:
+                    self.update(x, y, col)
 
     def update(self, x, y, value):
         """Update a cell at indices (x, y) with a given value, across all three board representations
         Remove that value as a possibility from cells in the same row/column/region
         """
+        possibilities = self.rows[y][x]
+        if not isinstance(possibilities, set):
+            # Cell is already solved, so a different value is a contradiction
+            if possibilities != value:
+                self.error = True
+            return
+        if value not in possibilities:
+            self.error = True
+
+        # Update counters
+        units = strategies.CELL_UNITS[(y, x)]
+        for u, _ in units:
+            self.number_counts[u][value] += 1
+            if self.number_counts[u][value] > 1:
+                # Repeated value within the same row, column or region
+                self.error = True
+        self.placed_count      += 1
+        self.possibility_count -= len(possibilities)
+        for possibility in possibilities:
+            for u, i in units:
+                self.location_counts[u][possibility] -= 1
+                self.location_masks [u][possibility] &= ~(1 << i)
+                if self.location_counts[u][possibility] == 0 and self.number_counts[u][possibility] == 0:
+                    # No possible location left for this number in the row, column or region
+                    self.error = True
+
         # Update value
         self.rows[y][x] = value
         self.cols[x][y] = value
         self.regions[ ROWS_TO_REGIONS[(y, x)][0] ][ ROWS_TO_REGIONS[(y, x)][1] ] = value
 
-        # Remove possibilities from row
-        for cell in self.rows[y]:
-            if isinstance(cell, set):
-                cell.discard(value)
-        # Remove possiblities from column
-        for cell in self.cols[x]:
-            if isinstance(cell, set):
-                cell.discard(value)
-        # Remove possibilites from 3x3 region
-        for cell in self.regions[ ROWS_TO_REGIONS[(y, x)][0] ]:
-            if isinstance(cell, set):
-                cell.discard(value)
+        # Remove possibilities from row, column and 3x3 region
+        for py, px in strategies.PEERS[(y, x)]:
+            self.eliminate(px, py, value)
+
+    def eliminate(self, x, y, *values):
+        """Remove the given values as possibilities from the unsolved cell at indices (x, y), if present"""
+        possibilities = self.rows[y][x]
+        if not isinstance(possibilities, set):
+            return
+
+        for value in values:
+            if value in possibilities:
+                possibilities.discard(value)
+                self.possibility_count -= 1
+                for u, i in strategies.CELL_UNITS[(y, x)]:
+                    self.location_counts[u][value] -= 1
+                    self.location_masks [u][value] &= ~(1 << i)
+                    if self.location_counts[u][value] == 0 and self.number_counts[u][value] == 0:
+                        # No possible location left for this number in the row, column or region
+                        self.error = True
+
+        if not possibilities:
+            # No possibilities left for this cell
+            self.error = True
 
     def print_board(self, board = False):
         """Prints a sudoku board with filled numbers displayed."""
@@ -153,39 +199,34 @@ class SudokuPuzzle():
     def apply_strategies(self, board):
         """Apply Sudoku strategies until no further possibilities can be eliminated"""
 
-        starting_possibilities = count_possibilities(board.rows)
+        if check_error(board) is True:
+            # Error found before applying any strategies (e.g. an invalid starting board or guess)
+            return False
+        starting_possibilities = count_possibilities(board)
 
-        # Eliminate possibilites based on numbers already placed on the board
-        strategies.elim_placed_nums(board.rows)
-        strategies.elim_placed_nums(board.cols)
-        strategies.elim_placed_nums(board.regions)
         while True:
-            # Apply Sudoku solving strategies defined in strategies.py
-            strategies.fill_one_possibility(board)
-            strategies.fill_only_location(board)
-            strategies.elim_line_in_region(board)
-            strategies.elim_region_in_line(board)
-            for n in range(2, 6):
-                strategies.elim_hidden_chain(board.rows   , n)
-                strategies.elim_hidden_chain(board.cols   , n)
-                strategies.elim_hidden_chain(board.regions, n)
-            for n in range(2, 6):
-                strategies.elim_naked_chain(board.rows   , n)
-                strategies.elim_naked_chain(board.cols   , n)
-                strategies.elim_naked_chain(board.regions, n)
             self.total_loops += 1
 
-            # Check for progress and errors in the solution
-            ending_possibilities = count_possibilities(board.rows)
+            # Apply Sudoku solving strategies defined in strategies.py
+            # Stop as soon as any strategy finds an error in the solution
+            for name, strategy in BASIC_STRATEGIES.items():
+                strategy(board)
+                if check_error(board) is True:
+                    return False
+            if count_possibilities(board) == starting_possibilities:
+                # Only apply the more expensive fish, wing and coloring strategies once the above have stalled
+                for name in self.advanced_strategies:
+                    ADVANCED_STRATEGIES[name](board)
+                    if check_error(board) is True:
+                        return False
+
+            # Check for progress in the solution
+            ending_possibilities = count_possibilities(board)
             if starting_possibilities == ending_possibilities:
                 # No more progress can be made using current strategies
                 return None
             starting_possibilities = ending_possibilities
 
-            if check_error(board) is True:
-                # Error found in the solution
-                return False
-
     def recursive_solve(self, board):
         """Use recursion (aka. DFS / trial and error) to find a solution
         Guesses in cells with the least possibilities first
@@ -202,7 +243,8 @@ class SudokuPuzzle():
         # Try possibilities
         for cell, y, x in unsolved_cells:
             for value in cell:
-                print(f'{"*"*10} Trying {value} at position ({x+1},{9-y}) {"*"*10}')
+                if self.verbose:
+                    print(f'{"*"*10} Trying {value} at position ({x+1},{9-y}) {"*"*10}')
                 temp_board = copy.deepcopy(board)
                 temp_board.update(x, y, value)
                 self.trials += 1
@@ -226,29 +268,35 @@ class SudokuPuzzle():
     def solve(self):
         """Solve the Sudoku board stored in self.board"""
 
-        print("\nStarting board:")
-        self.print_board(self.rows)
+        if self.verbose:
+            print("\nStarting board:")
+            self.print_board(self.rows)
 
         # Solve Sudoku without trial and error, unless and until it gets stuck
         if self.apply_strategies(self) is None:
             if check_complete(self) is False:
                 self.pre_recursion_loops = self.total_loops
-                print('Got this far without trial and error:')
-                self.print_board(self.rows)
-                print(f'Possibilities remaining: {count_possibilities(self.rows)}')
-                print('Solving recursively using trial and error...')
+                if self.verbose:
+                    print('Got this far without trial and error:')
+                    self.print_board(self.rows)
+                    print(f'Possibilities remaining: {count_possibilities(self)}')
+                    print('Solving recursively using trial and error...')
                 solved = copy.deepcopy(self.recursive_solve(self))
-                # Update the current object instance with the solution
-                for y, row in enumerate(solved.rows):
-                    for x, value in enumerate(row):
-                        self.update(x, y, value)
+                # Update the current object instance with the solution (recursive_solve() returns False if there is none)
+                if solved:
+                    for y, row in enumerate(solved.rows):
+                        for x, value in enumerate(row):
+                            if isinstance(self.rows[y][x], set):
+                                self.update(x, y, value)
             else:
                 self.pre_recursion_loops = self.total_loops
-                print('No recursion/backtracking needed!')
-
-        self.print_board(self.rows)
-        print(f'Loops to solve: {self.total_loops}')
-        print(f'Loops during recursion: {self.total_loops - self.pre_recursion_loops}')
-        print(f'Numbers of guesses: {self.trials}')
+                if self.verbose:
+                    print('No recursion/backtracking needed!')
+
+        if self.verbose:
+            self.print_board(self.rows)
+            print(f'Loops to solve: {self.total_loops}')
+            print(f'Loops during recursion: {self.total_loops - self.pre_recursion_loops}')
+            print(f'Numbers of guesses: {self.trials}')
 
         return self.rows
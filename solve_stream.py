@@ -0,0 +1,180 @@
+#! python3
+"""
+Command-line batch solver that streams Sudoku boards from stdin (or a file) to stdout
+
+Input : one puzzle per line, either
+    - 81 characters read left to right and then top to bottom, with 0 or . for empty cells
+    - NDJSON objects with a "puzzle" key (81-character string or list of 9 rows) and an optional "id" key
+Output: one NDJSON object per puzzle, in input order, with id, puzzle, solution, status, loops, guesses and time
+    - status is "solved", "unsolvable" (no valid solution), "invalid" (could not parse the puzzle)
+      or "error" (the solver failed on this puzzle), with an "error" message for the last two
+A throughput summary is printed to stderr once all puzzles are solved,
+and the exit code is 1 if any line was invalid or failed
+
+Puzzles are solved by a pool of worker processes, with at most --queue-size puzzles in flight at once,
+so memory use stays flat no matter how large the input is
+
+Usage examples:
+    python solve_stream.py puzzles.txt > solutions.ndjson
+    cat puzzles.ndjson | python solve_stream.py --workers 4
+
+See board_solver.py -> for details on the SudokuPuzzle object
+See strategies.py   -> for details on non-recursive solving strategies
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import time
+from board_solver import SudokuPuzzle, check_complete
+
+def read_record(line):
+    """Split an input line into (id, puzzle), where id is None unless given in an NDJSON object
+
+    Raises ValueError if the line is not valid JSON, or not a JSON object
+    """
+    if not line.startswith('{'):
+        return None, line
+
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError('Expected a JSON object')
+    return record.get('id'), record.get('puzzle')
+
+def parse_puzzle(puzzle):
+    """Parse a puzzle (81-character string or list of 9 rows) into a simple_board
+
+    Raises ValueError if the puzzle is not a valid 9x9 board
+    """
+    if puzzle is None:
+        raise ValueError('Expected an object with a "puzzle" key')
+    if isinstance(puzzle, list):
+        if len(puzzle) != 9 or any(not isinstance(row, list) or len(row) != 9 for row in puzzle):
+            raise ValueError('Expected a list of 9 rows with 9 cells each')
+        # Check each cell before joining them, so that e.g. "12" and "" cannot pass as two cells
+        for row in puzzle:
+            for cell in row:
+                if isinstance(cell, bool) or not (
+                        (isinstance(cell, int) and 0 <= cell <= 9) or
+                        (isinstance(cell, str) and len(cell) == 1 and cell in '.0123456789')):
+                    raise ValueError(f'Expected cells to be integers 0-9, or one of the characters .0123456789, got {cell!r}')
+        puzzle = ''.join(str(cell) for row in puzzle for cell in row)
+    if not isinstance(puzzle, str) or len(puzzle) != 81:
+        raise ValueError('Expected 81 cells')
+    if any(char not in '.0123456789' for char in puzzle):
+        raise ValueError('Expected cells to be digits 1-9, or 0 or . for empty cells')
+
+    return [[0 if char == '.' else int(char) for char in puzzle[y*9:y*9 + 9]] for y in range(9)]
+
+def solve_line(index, line):
+    """Solve the puzzle on one input line and return the result as a dictionary"""
+    result = {'id': index, 'puzzle': None, 'solution': None, 'status': 'invalid', 'loops': 0, 'guesses': 0, 'time': 0.0}
+    try:
+        # Read the id first, so that it is reported even if the puzzle is invalid
+        puzzle_id, puzzle = read_record(line)
+        if puzzle_id is not None:
+            result['id'] = puzzle_id
+        board = parse_puzzle(puzzle)
+    except ValueError as error: # json.JSONDecodeError is a subclass of ValueError
+        result['error'] = str(error)
+        return result
+
+    result['puzzle'] = ''.join(str(cell) for row in board for cell in row)
+
+    start = time.perf_counter()
+    try:
+        sudoku = SudokuPuzzle(board, verbose=False)
+        sudoku.solve()
+    except Exception as error:
+        # Report the failure for this puzzle without stopping the rest of the stream
+        result['status'] = 'error'
+        result['error']  = f'{type(error).__name__}: {error}'
+        result['time']   = round(time.perf_counter() - start, 6)
+        return result
+    result['time']    = round(time.perf_counter() - start, 6)
+    result['loops']   = sudoku.total_loops
+    result['guesses'] = sudoku.trials
+
+    if check_complete(sudoku) is True:
+        result['status']   = 'solved'
+        result['solution'] = ''.join(str(cell) for row in sudoku.rows for cell in row)
+    else:
+        result['status'] = 'unsolvable'
+
+    return result
+
+def read_lines(stream):
+    """Yield (index, line) for each non-blank input line, numbered from 1"""
+    for index, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line:
+            yield index, line
+
+def solve_stream(lines, workers, queue_size):
+    """Solve (index, line) pairs and yield results in input order, with at most queue_size puzzles in flight"""
+    if workers == 1:
+        for index, line in lines:
+            yield solve_line(index, line)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        try:
+            for index, line in lines:
+                pending.append(executor.submit(solve_line, index, line))
+                if len(pending) >= queue_size:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Don't wait for queued puzzles if the results are no longer wanted (e.g. stdout was closed)
+            for future in pending:
+                future.cancel()
+
+def main(argv=None):
+    """Solve puzzles from stdin or a file and stream NDJSON results to stdout"""
+    parser = argparse.ArgumentParser(description='Solve Sudoku puzzles (81-character lines or NDJSON) and stream NDJSON results')
+    parser.add_argument('input', nargs='?', default='-', type=argparse.FileType('r', encoding='utf-8'),
+                        help='file of puzzles, one per line (default: read from stdin)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('-q', '--queue-size', type=int, default=None,
+                        help='maximum number of puzzles in flight (default: 4 x workers)')
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    queue_size = args.queue_size if args.queue_size is not None else 4 * args.workers
+    if queue_size < 1:
+        parser.error('--queue-size must be at least 1')
+
+    stream = args.input
+    counts = collections.Counter()
+    start  = time.perf_counter()
+    try:
+        for result in solve_stream(read_lines(stream), args.workers, queue_size):
+            counts[result['status']] += 1
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # Output was closed early (e.g. piped into head), so exit quietly
+        # Point stdout at devnull so that Python does not fail again flushing it on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+    total   = sum(counts.values())
+    print(f'Puzzles: {total} (solved: {counts["solved"]}, unsolvable: {counts["unsolvable"]}, '
+          f'invalid: {counts["invalid"]}, error: {counts["error"]}) '
+          f'in {elapsed:.3f}s -> {total / elapsed if elapsed else 0:.1f} puzzles/s with {args.workers} worker(s)',
+          file=sys.stderr)
+
+    return 0 if counts['invalid'] == 0 and counts['error'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,23 @@
 #! python3
 """
 Sudoku solving strategies:
-    - fill_one_possibility(board)     : fill cells with only 1 possible number remaining
-    - fill_only_location(board)       : fill a cell if it is the only cell in a row/col/region where a number can go
-    - elim_placed_nums(board_repr)    : eliminate possibilities based on solved numbers in the row, column or region
-    - elim_naked_chain(board_repr, n) : eliminate possibilities based on n cells that share same n possible numbers
-    - elim_hidden_chain(board_repr, n): eliminate possibilities based on n numbers that share the same n possible cell locations
-    - elim_line_in_region(board)      : unsolved numbers within a row/column whose only possible locations are in the same region
-    - elim_region_in_line(board)      : unsolved numbers within a region whose only possible locations are in the same row or column
-
-board     : refers to the SudokuBoard object
-board_repr: refers to one of three board representations (i.e. board.rows, board.cols, or board.regions)
+    - fill_one_possibility(board)       : fill cells with only 1 possible number remaining
+    - fill_only_location(board)         : fill a cell if it is the only cell in a row/col/region where a number can go
+    - elim_naked_chain(board, n)        : eliminate possibilities based on n cells that share same n possible numbers
+    - elim_hidden_chain(board, n)       : eliminate possibilities based on n numbers that share the same n possible cell locations
+    - elim_line_in_region(board)        : unsolved numbers within a row/column whose only possible locations are in the same region
+    - elim_region_in_line(board)        : unsolved numbers within a region whose only possible locations are in the same row or column
+    - elim_fish(board, n)               : n rows (columns) whose only locations for a number lie in the same n columns (rows)
+                                          (n=2: X-Wing, n=3: Swordfish, n=4: Jellyfish)
+    - elim_xy_wing(board)               : pivot cell {a, b} that sees pincer cells {a, c} and {b, c}
+    - elim_xyz_wing(board)              : pivot cell {a, b, c} that sees pincer cells {a, c} and {b, c}
+    - elim_simple_coloring(board)       : two-color chains of conjugate pairs (a number with only two locations in a zone)
+
+board: refers to the SudokuBoard object
+
+Possibilities are only ever removed through board.eliminate() and numbers only placed through board.update(),
+so that the board can keep its counters up to date (see board_solver.py)
+Eliminating possibilities based on solved numbers in the same row, column or region is done by board.update()
 """
 import itertools
 
@@ -36,7 +43,61 @@ def row_to_region_map():
 
     return rtr_map
 
+def unit_cells():
+    """Create list of the 27 rows, columns and 3x3 regions, each stored as a list of row-basis cell coordinates (y, x)
+
+    Indices 0-8 are rows, 9-17 are columns and 18-26 are 3x3 regions
+    """
+    units  = [[(y, x) for x in range(9)] for y in range(9)]
+    units += [[(y, x) for y in range(9)] for x in range(9)]
+    units += [[ROWS_TO_REGIONS[(r, c)] for c in range(9)] for r in range(9)]
+
+    return units
+
+def peer_map():
+    """Create dictionary that maps each cell (y, x) to the set of other cells sharing its row, column or 3x3 region"""
+    peers = {}
+    for unit in UNITS:
+        for cell in unit:
+            peers.setdefault(cell, set()).update(unit)
+    for cell, cell_peers in peers.items():
+        cell_peers.discard(cell)
+
+    return peers
+
+def cell_to_units_map():
+    """Create dictionary that maps each cell (y, x) to (unit, index) pairs for its row, column and 3x3 region
+        - i.e. UNITS[unit][index] == (y, x)
+    """
+    cell_units = {}
+    for u, unit in enumerate(UNITS):
+        for i, cell in enumerate(unit):
+            cell_units.setdefault(cell, []).append((u, i))
+
+    return cell_units
+
 ROWS_TO_REGIONS = row_to_region_map()
+UNITS           = unit_cells()
+PEERS           = peer_map()
+CELL_UNITS      = cell_to_units_map()
+
+# Number of set bits for every possible 9-bit location mask
+BIT_COUNTS = [bin(mask).count('1') for mask in range(1 << 9)]
+
+def digit_location_masks(board):
+    """For each of the 27 units (see unit_cells), map each unsolved number to a bitmask of the cells where it could go
+        - e.g. masks[u][n] & (1 << i) is set if number n is a possibility in cell UNITS[u][i]
+    Built from scratch; the board keeps the same masks up to date in board.location_masks, which strategies read
+    """
+    masks = [[0]*10 for _ in range(27)]
+    for u, unit in enumerate(UNITS):
+        for i, (y, x) in enumerate(unit):
+            cell = board.rows[y][x]
+            if isinstance(cell, set):
+                for possibility in cell:
+                    masks[u][possibility] |= 1 << i
+
+    return masks
 
 # Solving strategies
 
@@ -46,68 +107,30 @@ def fill_one_possibility(board):
     for y, row in enumerate(board.rows):
         for x, col in enumerate(row):
             if isinstance(col, set) and len(col) == 1:
-                board.update(x, y, col.pop())
+                board.update(x, y, next(iter(col)))
 
 def fill_only_location(board):
-    """Fill the only cell in a row/col/region that has a set with the given number as a possibility"""
-
-    # Rows
-    for y, row in enumerate(board.rows):
-        # Track locations in the row where each unsolved integer could potentially go
-        locations = {num:set() for num in range(1,10)}
-        for x, cell in enumerate(row):
-            if isinstance(cell, set):
-                for possibility in cell:
-                    locations[possibility].add(x)
-        # If there is only one possible location in the row, then we can place the integer there
-        for num, locs in locations.items():
-            if len(locs) == 1:
-                board.update(next(iter(locs)), y, num)  # value[0] = x location, row = y location, key = number
+    """Fill the only cell in a row/col/region that has a set with the given number as a possibility
 
-    # Columns
-    for x, col in enumerate(board.cols):
-        # Track locations in the column where each unsolved integer could potentially go
-        locations = {num:set() for num in range(1,10)}
-        for y, cell in enumerate(col):
-            if isinstance(cell, set):
-                for possibility in cell:
-                    locations[possibility].add(y)
-        # If there is only one possible location in the column, then we can place the integer there
-        for num, locs in locations.items():
-            if len(locs) == 1:
-                board.update(x, next(iter(locs)), num)  # value[0] = x location, row = y location, key = number
-
-    # 3x3 Regions
-    for r, region in enumerate(board.regions):
-        # Track locations in the 3x3 region where each unsolved integer could potentially go
-        locations = {num:set() for num in range(1,10)}
-        for c, cell in enumerate(region):
-            if isinstance(cell, set):
-                for possibility in cell:
-                    locations[possibility].add(c)
-        # If there is only one possible location in the 3x3 region, then we can place the integer there
-        for num, locs in locations.items():
-            if len(locs) == 1:
-                board.update( ROWS_TO_REGIONS[ (r, next(iter(locs))) ][1] , ROWS_TO_REGIONS[ (r, next(iter(locs))) ][0] , num )
-
-def elim_placed_nums(board_repr): # Single board of any representation
-    """Eliminate possibilities that have already occured in the same row/column/region (depending on representation passed)"""
-
-    for row in board_repr:
-        eliminate = {number for number in row if isinstance(number, int)}
-
-        for col in row:
-            if isinstance(col, set):
-                col -= eliminate
+    Reads the location counts and masks kept up to date by the board, so placements made earlier in the same call are seen
+    """
+    # Rows, then columns, then 3x3 regions
+    for u, unit in enumerate(UNITS):
+        for num in range(1, 10):
+            # If there is only one possible location in the unit, then we can place the integer there
+            if board.location_counts[u][num] == 1:
+                y, x = unit[ board.location_masks[u][num].bit_length() - 1 ]
+                board.update(x, y, num)
 
-def elim_naked_chain(board_repr, n):
+def elim_naked_chain(board, n):
     """Identify n cells that share some combination of the same n possible integers
         - e.g. Simplest variation (n=2), two cells in same row have same two possible integers
     Remove those n possible integers from the other cells in the same row, column or region
     """
 
     # Naked n-chain
-    for row in board_repr:
+    for unit in UNITS:
+        row = [board.rows[y][x] for y, x in unit]
         # Track all sets of size n or less as potential members of the chain
         potential_chain_members = []
         for chain_member in row:
@@ -122,34 +145,32 @@ def elim_naked_chain(board_repr, n):
                 if len(union) == n:
                     # Chain found! i.e. n possible numbers shared across n cells
                     # Remove these numbers as possibilities from other cells in same row/column/region
-                    for cell in row:
+                    for cell, (y, x) in zip(row, unit):
                         if isinstance(cell, set) and not cell.issubset(union):
-                            cell.difference_update(union) # Remove union elements from cell_
+                            board.eliminate(x, y, *(cell & union)) # Remove union elements from cell
 
-def elim_hidden_chain(board_repr, n):
+def elim_hidden_chain(board, n):
     """Identify n numbers that must go in n cells and remove all other possibilities in those cells
         - e.g. n=2 -> two integers are only in two cells. The other possibilities in those cells are removed
     """
-    for row in board_repr:
-        # Track locations, i.e. indices, where each unsolved integer could potentially go in the row/column/region
-        number_locations = {}
-        for x, cell in enumerate(row):
-            if isinstance(cell, set):
-                for unsolved_number in cell:
-                    number_locations.setdefault(unsolved_number, set())
-                    number_locations[unsolved_number].add(x)
+    for u, unit in enumerate(UNITS):
+        # Possible locations, i.e. bitmasks of indices, where each unsolved integer could go in the row/column/region
+        number_locations = board.location_masks[u]
+        unsolved_numbers = [num for num in range(1, 10) if number_locations[num]]
         # Skip if there are less than (or equal to) n unsolved integers in the row/column/region
-        # Otherwise, test all combinations of unsolved integers for a hidden chain
-        if len(number_locations) > n:
-            for combo in itertools.combinations(number_locations.items(), n):
-                combo_numbers   = set(         [k for k, v in combo])
-                combo_locations = set().union(*[v for k, v in combo]) # Union all possible locations for this combo
-                if len(combo_locations) == n:
+        # Otherwise, test all combinations of integers with n or fewer locations for a hidden chain
+        if len(unsolved_numbers) > n:
+            potential_chain_members = [num for num in unsolved_numbers if BIT_COUNTS[ number_locations[num] ] <= n]
+            for combo in itertools.combinations(potential_chain_members, n):
+                combo_locations = 0
+                for num in combo:
+                    combo_locations |= number_locations[num] # Union all possible locations for this combo
+                if BIT_COUNTS[combo_locations] == n:
                     # Hidden chain found! i.e. these n numbers must go in these n locations
                     # Remove other numbers as possibilities from these locations
-                    for x, cell in enumerate(row):
-                        if x in combo_locations:
-                            cell.intersection_update(combo_numbers) # Only keep numbers in combo_numbers
+                    for i, (y, x) in enumerate(unit):
+                        if combo_locations & (1 << i):
+                            board.eliminate(x, y, *(board.rows[y][x] - set(combo))) # Only keep numbers in combo
 
 def elim_line_in_region(board):
     """Identify unsolved numbers within a row/column whose only two/three possible locations are within the same region
@@ -172,7 +193,7 @@ def elim_line_in_region(board):
                     # Remove the number as a possiblility from unsolved cells in the region
                     # Ignore cells that are in the original row of interest
                     if isinstance(cell, set) and ROWS_TO_REGIONS[ (region_index, c) ][0] != y:
-                        cell.discard(k)
+                        board.eliminate(ROWS_TO_REGIONS[ (region_index, c) ][1], ROWS_TO_REGIONS[ (region_index, c) ][0], k)
 
     for x, col in enumerate(board.cols):
         # Track possible regions where each unsolved integer in the col could potentially go
@@ -191,7 +212,7 @@ def elim_line_in_region(board):
                     # Remove the number as a possiblility from unsolved cells in the region
                     # Ignore cells that are in the original column of interest
                     if isinstance(cell, set) and ROWS_TO_REGIONS[ (region_index, c) ][1] != x:
-                        cell.discard(k)
+                        board.eliminate(ROWS_TO_REGIONS[ (region_index, c) ][1], ROWS_TO_REGIONS[ (region_index, c) ][0], k)
 
 def elim_region_in_line(board):
     """Identify unsolved numbers within a region whose only two/three possible locations are in a single row or column
@@ -217,7 +238,7 @@ def elim_region_in_line(board):
                     # Remove the number as a possibility from unsolved cells in the row
                     # Ignore cells that are in the original region of interest
                     if isinstance(cell, set) and ROWS_TO_REGIONS[ (row_index, c) ][0] != r:
-                        cell.discard(k)
+                        board.eliminate(c, row_index, k)
 
                 # Possibilities cannot also be in the same column
                 number_cols.pop(k, None)
@@ -230,4 +251,132 @@ def elim_region_in_line(board):
                     # Remove the number as a possibility from unsolved cells in the column
                     # Ignore cells that are in the original region of interest
                     if isinstance(cell, set) and ROWS_TO_REGIONS[ (c, col_index) ][0] != r:
-                        cell.discard(k)
+                        board.eliminate(col_index, c, k)
+
+def elim_fish(board, n):
+    """Identify n rows where the only possible locations for a number all lie within the same n columns (or vice versa)
+        - e.g. n=2 (X-Wing), n=3 (Swordfish), n=4 (Jellyfish)
+    Remove that number as a possibility from the other cells in those n columns (or rows)
+    """
+    # Live masks: eliminations below only remove locations, so a fish found from them is still valid
+    masks = board.location_masks
+
+    # Rows as base with columns as cover, then columns as base with rows as cover
+    for base, cover in ((0, 9), (9, 0)):
+        for number in range(1, 10):
+            # Track base lines with 2 to n possible locations as potential members of the fish
+            potential_fish_members = [i for i in range(9) if 2 <= BIT_COUNTS[ masks[base + i][number] ] <= n]
+            if len(potential_fish_members) < n:
+                continue
+            for combo in itertools.combinations(potential_fish_members, n):
+                union = 0
+                for i in combo:
+                    union |= masks[base + i][number]
+                if BIT_COUNTS[union] == n:
+                    # Fish found! i.e. the number must go in these n cover lines within the n base lines
+                    # Remove the number as a possibility from the rest of the cover lines
+                    for j in range(9):
+                        if union & (1 << j):
+                            for i, (y, x) in enumerate(UNITS[cover + j]):
+                                if i not in combo:
+                                    board.eliminate(x, y, number)
+
+def elim_xy_wing(board):
+    """Identify a pivot cell {a, b} that sees two pincer cells {a, c} and {b, c}
+        - Whichever value the pivot takes, one of the pincers must be c
+    Remove c as a possibility from cells that see both pincers
+    """
+    bivalue_cells = [(y, x) for y, row in enumerate(board.rows) for x, cell in enumerate(row)
+                     if isinstance(cell, set) and len(cell) == 2]
+
+    for pivot in bivalue_cells:
+        pivot_set = board.rows[ pivot[0] ][ pivot[1] ]
+        if not isinstance(pivot_set, set) or len(pivot_set) != 2:
+            continue
+        # Pincers see the pivot and share exactly one possibility with it
+        pincers = [(cell, board.rows[ cell[0] ][ cell[1] ]) for cell in bivalue_cells if cell in PEERS[pivot]]
+        pincers = [(cell, s) for cell, s in pincers if isinstance(s, set) and len(s) == 2 and len(s & pivot_set) == 1]
+
+        for (cell1, set1), (cell2, set2) in itertools.combinations(pincers, 2):
+            # Pincers may have lost possibilities to eliminations from earlier pairs
+            if len(set1) != 2 or len(set2) != 2:
+                continue
+            shared = set1 - pivot_set
+            if len(shared) != 1 or shared != set2 - pivot_set or (set1 & pivot_set) == (set2 & pivot_set):
+                continue
+            # XY-Wing found! Remove c from cells that see both pincers
+            number = next(iter(shared))
+            for y, x in PEERS[cell1] & PEERS[cell2]:
+                board.eliminate(x, y, number)
+
+def elim_xyz_wing(board):
+    """Identify a pivot cell {a, b, c} that sees two pincer cells {a, c} and {b, c}
+        - Whichever value the pivot takes, one of the three cells must be c
+    Remove c as a possibility from cells that see the pivot and both pincers
+    """
+    for y, row in enumerate(board.rows):
+        for x, pivot_set in enumerate(row):
+            if not isinstance(pivot_set, set) or len(pivot_set) != 3:
+                continue
+            # Pincers see the pivot and are subsets of it
+            pincers = [((py, px), board.rows[py][px]) for py, px in PEERS[(y, x)]]
+            pincers = [(cell, s) for cell, s in pincers if isinstance(s, set) and len(s) == 2 and s < pivot_set]
+
+            for (cell1, set1), (cell2, set2) in itertools.combinations(pincers, 2):
+                shared = set1 & set2
+                if len(shared) != 1 or (set1 | set2) != pivot_set:
+                    continue
+                # XYZ-Wing found! Remove c from cells that see all three cells
+                number = next(iter(shared))
+                for ey, ex in PEERS[(y, x)] & PEERS[cell1] & PEERS[cell2]:
+                    board.eliminate(ex, ey, number)
+
+def elim_simple_coloring(board):
+    """Chain together conjugate pairs (the only two locations of a number in a row/column/region) and color them alternately
+        - Exactly one of the two colors in each chain holds the number
+    Color wrap: if two cells of the same color see each other, remove the number from every cell of that color
+    Color trap: remove the number from uncolored cells that see cells of both colors
+    """
+    masks = board.location_masks
+    for number in range(1, 10):
+        # Link the two cells of every conjugate pair
+        links = {}
+        for u, unit in enumerate(UNITS):
+            mask = masks[u][number]
+            if BIT_COUNTS[mask] == 2:
+                cell1, cell2 = [unit[i] for i in range(9) if mask & (1 << i)]
+                links.setdefault(cell1, set()).add(cell2)
+                links.setdefault(cell2, set()).add(cell1)
+
+        # Color each chain of linked cells alternately with 0 and 1
+        colored = set()
+        for start in links:
+            if start in colored:
+                continue
+            colors = {start: 0}
+            queue   = [start]
+            for cell in queue:
+                for linked in links[cell]:
+                    if linked not in colors:
+                        colors[linked] = 1 - colors[cell]
+                        queue.append(linked)
+            colored.update(colors)
+            if len(colors) < 3:
+                continue
+            groups = [[cell for cell, color in colors.items() if color == c] for c in (0, 1)]
+
+            # Color wrap
+            wrapped = False
+            for group in groups:
+                if any(cell2 in PEERS[cell1] for cell1, cell2 in itertools.combinations(group, 2)):
+                    for y, x in group:
+                        board.eliminate(x, y, number)
+                    wrapped = True
+            if wrapped:
+                continue
+
+            # Color trap
+            seen_by_0 = set().union(*[PEERS[cell] for cell in groups[0]])
+            seen_by_1 = set().union(*[PEERS[cell] for cell in groups[1]])
+            for y, x in (seen_by_0 & seen_by_1) - colors.keys():
+                board.eliminate(x, y, number)
@@ -0,0 +1,95 @@
+"""
+Tests for the counters that SudokuPuzzle keeps up to date in update() and eliminate()
+
+Run with: python -m pytest
+"""
+import pytest
+import strategies
+from board_solver import SudokuPuzzle, ADVANCED_STRATEGIES, BASIC_STRATEGIES, check_complete, check_error
+from benchmark_strategies import evil_corpus
+
+def empty_board():
+    """Return a board with no starting numbers"""
+    return [[0]*9 for _ in range(9)]
+
+def recount(board):
+    """Count every counter kept by the board from scratch"""
+    number_counts   = [[0]*10 for _ in range(27)]
+    location_counts = [[0]*10 for _ in range(27)]
+    for u, unit in enumerate(strategies.UNITS):
+        for y, x in unit:
+            cell = board.rows[y][x]
+            if isinstance(cell, set):
+                for possibility in cell:
+                    location_counts[u][possibility] += 1
+            else:
+                number_counts[u][cell] += 1
+    cells = [cell for row in board.rows for cell in row]
+
+    return {
+        'number_counts'    : number_counts,
+        'location_counts'  : location_counts,
+        'location_masks'   : strategies.digit_location_masks(board),
+        'placed_count'     : sum(1 for cell in cells if not isinstance(cell, set)),
+        'possibility_count': sum(len(cell) for cell in cells if isinstance(cell, set)),
+    }
+
+def assert_counters_match(board, after):
+    """Assert that every counter kept by the board equals a full recount"""
+    for counter, expected in recount(board).items():
+        assert getattr(board, counter) == expected, f'{counter} does not match a full recount after {after}'
+
+def test_valid_board_has_no_error():
+    sudoku = SudokuPuzzle(evil_corpus()[0], verbose=False)
+    assert check_error(sudoku) is False
+    assert_counters_match(sudoku, 'placing the starting numbers')
+
+def test_repeated_given_sets_error():
+    board = empty_board()
+    board[0][0] = 5
+    board[0][8] = 5
+    assert check_error(SudokuPuzzle(board, verbose=False)) is True
+
+def test_cell_with_no_possibilities_sets_error():
+    sudoku = SudokuPuzzle(empty_board(), verbose=False)
+    sudoku.eliminate(0, 0, *range(1, 9))
+    assert check_error(sudoku) is False
+    sudoku.eliminate(0, 0, 9)
+    assert check_error(sudoku) is True
+
+def test_number_with_no_location_in_unit_sets_error():
+    sudoku = SudokuPuzzle(empty_board(), verbose=False)
+    # Remove 5 from every cell of row 0, one at a time
+    for x in range(8):
+        sudoku.eliminate(x, 0, 5)
+    assert check_error(sudoku) is False
+    assert sudoku.location_counts[0][5] == 1
+    sudoku.eliminate(8, 0, 5)
+    assert check_error(sudoku) is True
+
+def test_same_only_location_for_two_numbers_sets_error():
+    sudoku = SudokuPuzzle(empty_board(), verbose=False)
+    # 1 and 2 can only go in the first cell of row 0
+    for x in range(1, 9):
+        sudoku.eliminate(x, 0, 1, 2)
+    sudoku.update(0, 0, 1)
+    assert check_error(sudoku) is True
+
+@pytest.mark.parametrize('board', evil_corpus())
+def test_counters_match_recount_after_solve(board):
+    sudoku = SudokuPuzzle(board, verbose=False, advanced_strategies=ADVANCED_STRATEGIES)
+    sudoku.solve()
+    assert check_complete(sudoku) is True
+    assert_counters_match(sudoku, 'solve()')
+
+@pytest.mark.parametrize('board', evil_corpus())
+def test_counters_match_recount_after_each_strategy(board):
+    sudoku = SudokuPuzzle(board, verbose=False)
+    # Apply every strategy in turn until no progress is made, as apply_strategies() does
+    while check_error(sudoku) is False:
+        starting_possibilities = sudoku.possibility_count
+        for name, strategy in {**BASIC_STRATEGIES, **ADVANCED_STRATEGIES}.items():
+            strategy(sudoku)
+            assert_counters_match(sudoku, name)
+        if sudoku.possibility_count == starting_possibilities:
+            break
@@ -0,0 +1,61 @@
+"""
+Tests for parsing input lines and streaming results in solve_stream.py
+
+Run with: python -m pytest
+"""
+import json
+import pytest
+from solve_stream import parse_puzzle, read_record, solve_stream
+from benchmark_strategies import EVIL_BOARDS
+
+PUZZLE = EVIL_BOARDS[0]
+BOARD  = [[0 if char == '.' else int(char) for char in PUZZLE[y*9:y*9 + 9]] for y in range(9)]
+
+def test_read_record_plain_line():
+    assert read_record(PUZZLE) == (None, PUZZLE)
+
+def test_read_record_ndjson():
+    assert read_record(json.dumps({'id': 'abc', 'puzzle': PUZZLE})) == ('abc', PUZZLE)
+
+def test_read_record_keeps_id_without_puzzle():
+    assert read_record('{"id": "abc"}') == ('abc', None)
+
+@pytest.mark.parametrize('line', ['{"id": ', '{} []'])
+def test_read_record_invalid_json(line):
+    with pytest.raises(ValueError):
+        read_record(line)
+
+def test_parse_puzzle_string():
+    assert parse_puzzle(PUZZLE) == BOARD
+    assert parse_puzzle(PUZZLE.replace('.', '0')) == BOARD
+
+def test_parse_puzzle_list():
+    assert parse_puzzle(BOARD) == BOARD
+    assert parse_puzzle([[str(cell) if cell else '.' for cell in row] for row in BOARD]) == BOARD
+
+@pytest.mark.parametrize('puzzle', [
+    None,
+    PUZZLE[:80],
+    PUZZLE[:80] + 'x',
+    BOARD[:8],
+    [row[:8] for row in BOARD],
+    [['12', ''] + [0]*7] + BOARD[1:], # Joins to 9 characters, but is not 9 cells
+    [[True] + [0]*8] + BOARD[1:],
+    [[10] + [0]*8] + BOARD[1:],
+    [[-1] + [0]*8] + BOARD[1:],
+    [[1.0] + [0]*8] + BOARD[1:],
+])
+def test_parse_puzzle_invalid(puzzle):
+    with pytest.raises(ValueError):
+        parse_puzzle(puzzle)
+
+def test_solve_stream_keeps_input_order_with_workers():
+    lines = [(index, puzzle) for index, puzzle in enumerate(EVIL_BOARDS, start=1)]
+    lines.insert(3, (99, '{"id": "bad", "puzzle": "123"}'))
+    results = list(solve_stream(iter(lines), workers=2, queue_size=3))
+
+    assert [result['id'] for result in results] == [1, 2, 3, 'bad', 4, 5, 6, 7, 8, 9]
+    assert [result['status'] for result in results] == ['solved']*3 + ['invalid'] + ['solved']*6
+    for result, (_, puzzle) in zip([r for r in results if r['status'] == 'solved'], [l for l in lines if l[0] != 99]):
+        assert result['puzzle'] == puzzle.replace('.', '0')
+        assert all(given in ('0', solved) for given, solved in zip(result['puzzle'], result['solution']))